@@ -286,6 +286,9 @@ def deep_update(d: dict, u: collections.abc.Mapping) -> dict:
     deeply nested levels in input dictionary `d`.  **Note** that this
     would also extend `d` with new keys from `u`.
 
+    Nested dicts and lists from `u` are copied, not shared, so that
+    later updates of `d` do not modify `u`.
+
     Parameters
     ----------
     d
@@ -300,6 +303,12 @@ def deep_update(d: dict, u: collections.abc.Mapping) -> dict:
     """
     # modified from https://stackoverflow.com/a/3233356/46058
     # see also https://github.com/pydantic/pydantic/blob/v2.7.4/pydantic/_internal/_utils.py#L103
+    if not d and not any(isinstance(v, (collections.abc.Mapping, collections.abc.MutableSequence))
+                         for v in u.values()):
+        # fast path: nothing to merge with, and only leaf values to copy
+        d.update(u)
+        return d
+
     for k, v in u.items():
         if isinstance(v, collections.abc.Mapping):
             d[k] = deep_update(d.get(k, {}), v)
@@ -1551,23 +1560,23 @@ class AnnotatedHunk:
         # lex pre-image and post-image, separately
         for line_type in {unidiff.LINE_TYPE_ADDED, unidiff.LINE_TYPE_REMOVED}:
             # TODO: use NamedTuple, or TypedDict, or dataclass
-            line_data = {
-                i: {
-                    'value': line.value,
-                    'hunk_line_no': i,
-                    'file_line_no': self.file_line_no(line),
-                    'line_type': line.line_type,
-                } for i, line in enumerate(self.hunk)
-                # unexpectedly, there is no need to check for unidiff.LINE_TYPE_EMPTY
-                if line.line_type in {line_type, unidiff.LINE_TYPE_CONTEXT}
-            }
-
+            line_data = {}
+            # pre-/post-image fragment, gathered in the same single pass over hunk
+            source_parts = []
             in_hunk_changed_line_idx = 0
             for i, line in enumerate(self.hunk):
-                if i not in line_data:
+                # unexpectedly, there is no need to check for unidiff.LINE_TYPE_EMPTY
+                if line.line_type not in {line_type, unidiff.LINE_TYPE_CONTEXT}:
                     continue
 
-                line_data[i]['in_hunk'] = in_hunk_changed_line_idx
+                line_data[i] = {
+                    'value': line.value,
+                    'hunk_line_no': i,
+                    'file_line_no': self.file_line_no(line),
+                    'line_type': line.line_type,
+                    'in_hunk': in_hunk_changed_line_idx,
+                }
+                source_parts.append(line.value)
                 if line.is_added or line.is_removed:
                     in_hunk_changed_line_idx += 1
 
@@ -1575,7 +1584,7 @@ class AnnotatedHunk:
             if tokens_group is None:
                 # pre-/post-image content is not available, use what is in diff
                 # dicts are sorted, line_data elements are entered ascending
-                source = ''.join([line['value'] for line in line_data.values()])
+                source = ''.join(source_parts)
 
                 tokens_list = LEXER.lex(file_path, source)
                 tokens_split = split_multiline_lex_tokens(tokens_list)
@@ -1583,8 +1592,9 @@ class AnnotatedHunk:
                 # just in case, it should not be necessary
                 tokens_group = front_fill_gaps(tokens_group)
                 # index tokens_group with hunk line no, not line index of pre-/post-image fragment
+                hunk_line_nos = list(line_data)
                 tokens_group = {
-                    list(line_data.values())[source_line_no]['hunk_line_no']: source_tokens_list
+                    hunk_line_nos[source_line_no]: source_tokens_list
                     for source_line_no, source_tokens_list
                     in tokens_group.items()
                 }
@@ -68,6 +68,14 @@ from typing_extensions import Annotated
 from .annotate import Bug
 from .config import JSONFormat, guess_format_version
 
+# optional dependencies
+try:
+    # noinspection PyPackageRequirements
+    import orjson
+    has_orjson = True
+except ImportError:
+    has_orjson = False
+
 
 # configure logging
 logger = logging.getLogger(__name__)
@@ -158,6 +166,34 @@ class PurposeCounterResults:
                 self._removed_line_purposes + other._removed_line_purposes)
             return new_instance
 
+    def __iadd__(self, other: 'PurposeCounterResults') -> 'PurposeCounterResults':
+        """Add results from `other` in place, used by `+=`
+
+        Combining results from many files with `+=` this way does not
+        create new list of processed files, and new counters, each time.
+        """
+        if isinstance(other, PurposeCounterResults):
+            self._processed_files.extend(other._processed_files)
+            self._hunk_purposes += other._hunk_purposes
+            self._added_line_purposes += other._added_line_purposes
+            self._removed_line_purposes += other._removed_line_purposes
+            return self
+
+        return NotImplemented
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PurposeCounterResults):
+            return NotImplemented
+
+        # cheap check first, before comparing lists and counters element by element
+        if len(self._processed_files) != len(other._processed_files):
+            return False
+
+        return (self._hunk_purposes == other._hunk_purposes and
+                self._added_line_purposes == other._added_line_purposes and
+                self._removed_line_purposes == other._removed_line_purposes and
+                self._processed_files == other._processed_files)
+
     def __repr__(self) -> str:
         return f"PurposeCounterResults(_processed_files={self._processed_files!r}, " \
                f"_hunk_purposes={self._hunk_purposes!r}, " \
@@ -219,14 +255,13 @@ class PurposeCounterResults:
             # TODO: log info / debug
             #print(f"PurposeCounterResults.create: {change_file=}, {change_data.keys()=}")
             file_purposes[change_data['purpose']] += 1
+            # Counter.update() counts elements of iterable in C code
             if '+' in change_data:
                 added_lines = change_data['+']
-                for added_line in added_lines:
-                    added_line_purposes[added_line['purpose']] += 1
+                added_line_purposes.update(added_line['purpose'] for added_line in added_lines)
             if '-' in change_data:
                 removed_lines = change_data['-']
-                for removed_line in removed_lines:
-                    removed_line_purposes[removed_line['purpose']] += 1
+                removed_line_purposes.update(removed_line['purpose'] for removed_line in removed_lines)
         return PurposeCounterResults([file_path], file_purposes, added_line_purposes, removed_line_purposes)
 
 
@@ -247,6 +282,15 @@ class ListAddedLinesResults:
                 self._added_lines + other._added_lines)
             return new_instance
 
+    def __iadd__(self, other):
+        """Add results from `other` in place, used by `+=`"""
+        if isinstance(other, ListAddedLinesResults):
+            self._processed_files.extend(other._processed_files)
+            self._added_lines.extend(other._added_lines)
+            return self
+
+        return NotImplemented
+
     def __repr__(self):
         return f"ListAddedLinesResults(_processed_files={self._processed_files!r}, _added_lines={self._added_lines!r}"
 
@@ -299,6 +343,29 @@ class AnnotatedFile:
         """
         self._path = Path(file_path)
 
+    def load_data(self) -> dict:
+        """Read and parse annotation data from the file
+
+        Uses much faster `orjson` library to parse JSON, if it is available
+        (install 'patchscope[orjson]').  Falls back to the standard `json`
+        module if `orjson` cannot parse the file; for example, `orjson`
+        rejects NaN and Infinity values, which `json.dump()` writes by default.
+
+        Returns
+        -------
+        dict
+            annotation data, as parsed from JSON file
+        """
+        if has_orjson:
+            contents = self._path.read_bytes()
+            try:
+                return orjson.loads(contents)
+            except orjson.JSONDecodeError:
+                return json.loads(contents)
+
+        with self._path.open('r') as json_file:
+            return json.load(json_file)
+
     def gather_data(self, bug_mapper: Callable[..., T],
                     **mapper_kwargs) -> T:
         """Retrieves data from file
@@ -317,10 +384,9 @@ class AnnotatedFile:
         if file_format is None:
             logger.warning(f"Unknown annotation file format for '{self._path}'")
             file_format = JSONFormat.V1_5
-        with self._path.open('r') as json_file:
-            data = json.load(json_file)
-            return bug_mapper(str(self._path), data,
-                              data_format=file_format, **mapper_kwargs)
+        data = self.load_data()
+        return bug_mapper(str(self._path), data,
+                          data_format=file_format, **mapper_kwargs)
 
 
 class AnnotatedBug:
@@ -338,7 +404,7 @@ class AnnotatedBug:
         self._annotations_path = self._path / annotations_dir
 
         try:
-            self.annotations = [str(d.name) for d in self._annotations_path.iterdir()]
+            self.annotations = os.listdir(self._annotations_path)
         except Exception as ex:
             print(f"Error in AnnotatedBug for '{self._path}': {ex}")
 
@@ -410,8 +476,10 @@ class AnnotatedBugDataset:
         self.bugs: list[str] = []
 
         try:
-            self.bugs = [str(d.name) for d in self._path.iterdir()
-                         if d.is_dir()]
+            # DirEntry.is_dir() usually does not need a system call, unlike Path.is_dir()
+            with os.scandir(self._path) as entries:
+                self.bugs = [entry.name for entry in entries
+                             if entry.is_dir()]
         except Exception as ex:
             print(f"Error in AnnotatedBugDataset for '{self._path}': {ex}")
 
@@ -45,6 +45,11 @@ from pathlib import Path, PurePath
 from typing import TypeVar
 
 import yaml
+# use much faster LibYAML based parser, if PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # configure logging
 logger = logging.getLogger(__name__)
@@ -226,7 +231,7 @@ class Languages(object):
     def _read(self):
         """Read, parse, and extract information from 'languages.yml'"""
         with open(self.yaml, "r") as stream:
-            self.languages = yaml.safe_load(stream)
+            self.languages = yaml.load(stream, Loader=SafeLoader)
 
         self.ext_primary = defaultdict(list)
         self.ext_lang = defaultdict(list)
@@ -256,15 +261,16 @@ class Languages(object):
     def _path2lang(self, file_path: str) -> str:
         """Convert path of file in repository to programming language of file"""
         # TODO: consider switching from Path.stem to Path.name (basename)
-        filename, ext = Path(file_path).stem, Path(file_path).suffix  # os.file_path.splitext(file_path)
-        basename = Path(file_path).name
+        path = PurePath(file_path)
+        filename, ext = path.stem, path.suffix  # os.file_path.splitext(file_path)
+        basename = path.name
         #print(f"{file_path=}: {filename=}, {ext=}, {basename=}")
 
-        # NOTE: or dict(itertools.chain.from_iterable(d.items() for d in (d1, d2, d3)))
-        # NOTE: FILENAME_TO_LANGUAGES overrides what's from Linguist 'languages.yml'
-        filenames_lang = dict(self.filenames_lang, **FILENAME_TO_LANGUAGES)
-        if basename in filenames_lang:
-            ret = languages_exceptions(file_path, filenames_lang[basename])
+        # NOTE: FILENAME_TO_LANGUAGES overrides what's from Linguist 'languages.yml';
+        # check both in order, instead of creating merged dict on each call
+        filename_langs = FILENAME_TO_LANGUAGES.get(basename, self.filenames_lang.get(basename))
+        if filename_langs is not None:
+            ret = languages_exceptions(file_path, filename_langs)
             # Debug to catch filenames (basenames) with language collisions
             if len(ret) > 1:
                 logger.warning(f"Filename collision in filenames_lang for '{file_path}': {ret}")
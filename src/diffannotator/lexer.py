@@ -15,7 +15,7 @@ Example usage:
   >>> from diffannotator.lexer import Lexer
   >>> LEXER = Lexer()
   >>> file_path = Path('tests/test_code_fragments/example_line_callback_func.py')
-  >>> tokens_list = LEXER.lex(file_path.name, file_path.read_text())
+  >>> tokens_list = list(LEXER.lex(file_path.name, file_path.read_text()))
   >>> LEXER.lexers
   {'.py': <pygments.lexers.PythonLexer>}
   >>> tokens_list[:3]
@@ -24,18 +24,98 @@ Example usage:
 This module is used by the diff-annotate script, with sources in annotate.py
 source code file.
 """
+import fnmatch
+import functools
 import logging
-from pathlib import Path
-from collections.abc import Iterable
+import os
+import re
+from collections.abc import Iterator
 
-import pygments
+import pygments.lexers
+import pygments.util
 from pygments.lexer import Lexer as PygmentsLexer
-from pygments import lexers, util
+from pygments.lexers.special import TextLexer
 
 
 # support logging
 logger = logging.getLogger(__name__)
 
+# Pygments filename pattern that matches only by suffix, like '*.py'
+RE_SUFFIX_ONLY_PATTERN = re.compile(r'\*\.[^.*?\[\]]+')
+
+
+# returned by `lexer_for_key()` if no lexer was found; compared by identity
+FALLBACK_LEXER = TextLexer()
+
+
+@functools.cache
+def _special_filenames_regexp() -> re.Pattern:
+    """Regexp matching file names that some Pygments lexer recognizes not only by suffix
+
+    Examples of such filename patterns are 'CMakeLists.txt', 'Makefile.*',
+    'meson.build', or '*.html.j2'; for files matching those, the lexer
+    cannot be selected based on the suffix alone.
+    """
+    patterns = {
+        pattern
+        for _, _, filenames, _ in pygments.lexers.get_all_lexers(plugins=True)
+        for pattern in filenames
+        if not RE_SUFFIX_ONLY_PATTERN.fullmatch(pattern)
+    }
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in sorted(patterns)))
+
+
+@functools.lru_cache(maxsize=4096)
+def lexer_key(basename: str) -> str:
+    """Key for `lexer_for_key()` and `Lexer.lexers`, for file with given basename
+
+    This is the file suffix (extension), so that files with the same suffix
+    share the lexer, unless Pygments has a lexer for more specific filename
+    pattern matching `basename` (like 'CMakeLists.txt'), or the file has
+    no suffix; in those cases it is the basename itself.
+    """
+    suffix = os.path.splitext(basename)[1]
+    # there are many different file types with an empty suffix
+    # NOTE: Path('foo.').suffix is '', but os.path.splitext('foo.')[1] is '.'
+    if len(suffix) <= 1 or _special_filenames_regexp().match(basename):
+        return basename
+    return suffix
+
+
+@functools.lru_cache(maxsize=128)
+def lexer_for_key(key: str) -> PygmentsLexer:
+    """Get lexer for given file suffix, or basename for files without suffix
+
+    The result is cached, so that the (slow) lookup in the Pygments'
+    registry of lexers, and the creation of lexer object, happens only
+    once per distinct key.  This cache is shared by all `Lexer` instances.
+
+    **NOTE** that because of this, returned lexer objects are shared,
+    and should be treated as frozen: do not change their options, nor
+    add filters to them (e.g. with `add_filter()`); create a new lexer
+    object with `pygments.lexers.get_lexer_for_filename()` instead.
+
+    Parameters
+    ----------
+    key
+        file suffix (extension) including the leading dot, for example
+        '.py', or the basename of file, for example 'Makefile' or
+        'CMakeLists.txt'; see `lexer_key()`
+
+    Returns
+    -------
+    PygmentsLexer
+        appropriate lexer, or `FALLBACK_LEXER` (a Text lexer) if no lexer
+        was found for `key`
+    """
+    try:
+        # file patterns used by Pygments lexers are wildcards like '*.py',
+        # which match also the suffix by itself
+        return pygments.lexers.get_lexer_for_filename(key)
+    except pygments.util.ClassNotFound:
+        # the caller, which knows the file name, logs the warning
+        return FALLBACK_LEXER
+
 
 class Lexer(object):
     """Holder and proxy for lexers
@@ -61,29 +141,25 @@ class Lexer(object):
         PygmentsLexer
             appropriate lexer
         """
-        suffix = Path(filename).suffix
-        # there are many different file types with an empty suffix
-        if not suffix:
-            # use basename of the file as key in self.lexers
-            suffix = Path(filename).name
-
-        if suffix in self.lexers:
-            return self.lexers[suffix]
+        # cheaper than creating Path(filename) to get .name
+        key = lexer_key(os.path.basename(filename))
 
         try:
-            lexer = pygments.lexers.get_lexer_for_filename(filename)
-        except pygments.util.ClassNotFound:
-            logger.warning(f"Warning: No lexer found for '{filename}', trying Text lexer")
-            # TODO: use Text lexer directly: pygments.lexers.special.TextLexer
-            lexer = lexers.get_lexer_for_filename("Test.txt")
-
-        self.lexers[suffix] = lexer
+            return self.lexers[key]
+        except KeyError:
+            lexer = lexer_for_key(key)
+            if lexer is FALLBACK_LEXER:
+                logger.warning(f"Warning: No lexer found for '{filename}', trying Text lexer")
+            self.lexers[key] = lexer
 
-        return lexer
+            return lexer
 
-    def lex(self, filename: str, code: str) -> Iterable[tuple]:
+    def lex(self, filename: str, code: str) -> Iterator[tuple]:
         """Run lexer on a fragment of code from file with given filename
 
+        Tokens are generated lazily, without creating the list of all
+        tokens; use `list(lexer.lex(...))` if you need such list.
+
         Parameters
         ----------
         filename
@@ -91,16 +167,15 @@ class Lexer(object):
         code
             source code or text to parse
 
-        Returns
-        -------
-        Iterable[tuple]
-            iterable of (index, token_type, text_fragment) tuples
+        Yields
+        ------
+        tuple
+            (index, token_type, text_fragment) tuples
         """
         lexer = self.get_lexer(filename)
 
         if not lexer:
             logger.error(f"Error in lex: no lexer selected for file '{filename}'")
-            return []
+            return
 
-        # TODO: consider returning generator or iterator, instead of iterable/list
-        return list(lexer.get_tokens_unprocessed(code))
+        yield from lexer.get_tokens_unprocessed(code)
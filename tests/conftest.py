@@ -10,10 +10,14 @@ https://docs.pytest.org/en/stable/reference/fixtures.html#conftest-py-sharing-fi
 import os
 import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
 
+from diffannotator.languages import Languages
 from diffannotator.utils.git import GitRepo
+if TYPE_CHECKING:
+    from diffannotator.lexer import Lexer
 
 # global variable, common for all tests
 default_branch = 'main'
@@ -46,6 +50,24 @@ def pytest_collection_modifyitems(config, items):
 ## fixtures
 
 
+@pytest.fixture(scope="session")
+def langs() -> Languages:
+    """Shared `Languages` object, so that 'languages.yml' is parsed only once"""
+    return Languages()
+
+
+@pytest.fixture(scope="session")
+def lexer() -> 'Lexer':
+    """Shared `Lexer` object, reusing lexers between tests
+
+    The 'lexer' module is imported lazily, so that tests that do not
+    need it do not pay for importing Pygments.
+    """
+    from diffannotator.lexer import Lexer
+
+    return Lexer()
+
+
 @pytest.fixture(scope="module")  # like unittest.setUpClass()
 def example_repo(tmp_path_factory: pytest.TempPathFactory) -> GitRepo:
     """Prepare Git repository for testing `utils.git` module
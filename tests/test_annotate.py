@@ -110,6 +110,15 @@ def test_deep_update():
     assert "new key" in result and result["new key"] == 1, \
         "new key 'new key' added"
 
+    result = deep_update({}, update)
+    assert result == update, \
+        "updating empty dict gives the contents of update"
+
+    update_copy = copy.deepcopy(update)
+    deep_update(result, update)
+    assert update == update_copy, \
+        "deep_update() does not modify the data to update with"
+
 
 def test_clean_text():
     text_to_clean = "some text with * / \\ \t and\nnew\nlines     and  spaces"
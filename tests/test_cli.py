@@ -11,6 +11,7 @@ from pathlib import Path
 import pytest
 from typer.testing import CliRunner
 
+from diffannotator import languages
 from diffannotator.annotate import app as annotate_app, Bug
 from diffannotator.generate_patches import app as generate_app
 from diffannotator.gather_data import app as gather_app
@@ -20,6 +21,18 @@ from .conftest import count_pm_lines
 runner = CliRunner()
 
 
+@pytest.fixture
+def isolated_languages_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Do not leak changes to global mappings in 'languages' module to other tests
+
+    The app modifies those mappings in place, e.g. clearing them with
+    `--ext-to-language=`; the test would work on their copies.
+    """
+    for mapping_name in ['EXT_TO_LANGUAGES', 'FILENAME_TO_LANGUAGES', 'PATTERN_TO_PURPOSE']:
+        monkeypatch.setattr(languages, mapping_name,
+                            dict(getattr(languages, mapping_name)))
+
+
 #-----------------------------------------------------------------------------
 # testing annotate_app
 
@@ -296,7 +309,8 @@ def test_annotate_patch_with_purpose_to_annotation(tmp_path: Path):
 
 
 # NOTE: some duplication with/similarities to test_annotate_patch_with_purpose_to_annotation
-def test_annotate_patch_with_pattern_to_purpose(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+def test_annotate_patch_with_pattern_to_purpose(tmp_path: Path, caplog: pytest.LogCaptureFixture,
+                                                isolated_languages_config: None):
     file_path = Path('tests/test_dataset/tqdm-1/c0dcf39b046d1b4ff6de14ac99ad9a1b10487512.diff')
     save_path = tmp_path.joinpath(file_path).with_suffix('.json')
 
@@ -328,7 +342,8 @@ def test_annotate_patch_with_pattern_to_purpose(tmp_path: Path, caplog: pytest.L
         "app does not add mapping via --pattern-to-purpose=<pattern> (no purpose)"
 
 
-def test_annotate_patch_with_ext_to_language(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+def test_annotate_patch_with_ext_to_language(tmp_path: Path, caplog: pytest.LogCaptureFixture,
+                                             isolated_languages_config: None):
     file_path = Path('tests/test_dataset/tqdm-1/c0dcf39b046d1b4ff6de14ac99ad9a1b10487512.diff')
     save_path = tmp_path.joinpath(file_path).with_suffix('.json')
 
@@ -376,7 +391,8 @@ def test_annotate_patch_with_ext_to_language(tmp_path: Path, caplog: pytest.LogC
 
 
 # TODO: very similar to previous test, use parametrized test
-def test_annotate_patch_with_filename_to_language(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+def test_annotate_patch_with_filename_to_language(tmp_path: Path, caplog: pytest.LogCaptureFixture,
+                                                  isolated_languages_config: None):
     file_path = Path('tests/test_dataset/tqdm-1/c0dcf39b046d1b4ff6de14ac99ad9a1b10487512.diff')
     save_path = tmp_path.joinpath(file_path).with_suffix('.json')
 
@@ -1,15 +1,37 @@
 # -*- coding: utf-8 -*-
 """Test cases for 'src/diffannotator/gather_data.py' module"""
 from collections import Counter
+from collections.abc import Iterator
 from pathlib import Path
 
-from diffannotator.gather_data import (PurposeCounterResults, AnnotatedBugDataset,
+import pytest
+
+from diffannotator import gather_data
+from diffannotator.gather_data import (PurposeCounterResults, AnnotatedBugDataset, AnnotatedFile,
                                        map_diff_to_purpose_dict, map_diff_to_timeline)
 
 
-def test_AnnotatedBugDataset_with_PurposeCounterResults():
-    dataset_path = 'tests/test_dataset_annotated'
-    annotated_bug_dataset = AnnotatedBugDataset(dataset_path)
+@pytest.fixture(scope="module")
+def annotated_bug_dataset() -> Iterator[AnnotatedBugDataset]:
+    """Annotated dataset in 'tests/test_dataset_annotated', shared by tests in this module
+
+    Each annotation file is read and parsed only once; afterward its data
+    is served from memory (mappers do not modify annotation data).
+    """
+    cache = {}
+    load_data = AnnotatedFile.load_data
+
+    def cached_load_data(self: AnnotatedFile) -> dict:
+        if self._path not in cache:
+            cache[self._path] = load_data(self)
+        return cache[self._path]
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(AnnotatedFile, 'load_data', cached_load_data)
+        yield AnnotatedBugDataset('tests/test_dataset_annotated')
+
+
+def test_AnnotatedBugDataset_with_PurposeCounterResults(annotated_bug_dataset: AnnotatedBugDataset):
     data = annotated_bug_dataset.gather_data(PurposeCounterResults.create, PurposeCounterResults.default)
     actual_paths = [Path(p).as_posix() for p in data._processed_files]
 
@@ -21,9 +43,7 @@ def test_AnnotatedBugDataset_with_PurposeCounterResults():
     assert data._removed_line_purposes == Counter({'programming': 25, 'markup': 13})
 
 
-def test_AnnotatedBugDataset_with_dict_mapping():
-    dataset_path = 'tests/test_dataset_annotated'
-    annotated_bug_dataset = AnnotatedBugDataset(dataset_path)
+def test_AnnotatedBugDataset_with_dict_mapping(annotated_bug_dataset: AnnotatedBugDataset):
     data_dict = annotated_bug_dataset.gather_data_dict(map_diff_to_purpose_dict)
 
     assert 'CVE-2021-21332' in data_dict
@@ -33,9 +53,7 @@ def test_AnnotatedBugDataset_with_dict_mapping():
         'documentation']
 
 
-def test_AnnotatedBugDataset_gather_data_list():
-    dataset_path = 'tests/test_dataset_annotated'
-    annotated_bug_dataset = AnnotatedBugDataset(dataset_path)
+def test_AnnotatedBugDataset_gather_data_list(annotated_bug_dataset: AnnotatedBugDataset):
     # TODO?: inject commit metadata, if missing
     #print(f"{annotated_bug_dataset.bugs=}")
 
@@ -126,3 +144,55 @@ def test_PurposeCounterResults_create():
     assert result._hunk_purposes == Counter({'programming': 1})
     assert result._added_line_purposes == Counter({'programming': 1})
     assert result._removed_line_purposes == Counter()
+
+
+def test_AnnotatedFile_load_data(monkeypatch: pytest.MonkeyPatch):
+    annotation_file = AnnotatedFile('tests/test_dataset_annotated/CVE-2021-21332/annotation/'
+                                    'e54746bdf7d5c831eabe4dcea76a7626f1de73df.json')
+    data = annotation_file.load_data()
+    assert 'UPGRADE.rst' in data, \
+        "annotation data was parsed"
+
+    monkeypatch.setattr(gather_data, 'has_orjson', False)
+    assert annotation_file.load_data() == data, \
+        "the same data is returned with and without orjson"
+
+
+def test_AnnotatedFile_load_data_nan(tmp_path: Path):
+    json_path = tmp_path / 'annotation.json'
+    json_path.write_text('{"metric": NaN, "other": Infinity}')
+    data = AnnotatedFile(json_path).load_data()
+    assert data['metric'] != data['metric'] and data['other'] == float('inf'), \
+        "NaN and Infinity (rejected by orjson) are parsed"
+
+
+def test_PurposeCounterResults_iadd():
+    combined = PurposeCounterResults.default()
+    combined_id = id(combined)
+    for file_name, purpose in [('a.json', 'programming'), ('b.json', 'documentation'), ('c.json', 'programming')]:
+        combined += PurposeCounterResults([file_name], Counter({purpose: 1}),
+                                          Counter({purpose: 2}), Counter())
+
+    assert id(combined) == combined_id, \
+        "results were combined in place"
+    assert combined._processed_files == ['a.json', 'b.json', 'c.json']
+    assert combined._hunk_purposes == Counter({'programming': 2, 'documentation': 1})
+    assert combined._added_line_purposes == Counter({'programming': 4, 'documentation': 2})
+    assert combined._removed_line_purposes == Counter()
+
+
+def test_PurposeCounterResults_eq():
+    result = PurposeCounterResults(['a.json'], Counter({'programming': 1}),
+                                   Counter({'programming': 2}), Counter())
+    same = PurposeCounterResults(['a.json'], Counter({'programming': 1}),
+                                 Counter({'programming': 2}), Counter({'data': 0}))
+    assert result == same, \
+        "results with equal counters and processed files are equal"
+
+    assert result != PurposeCounterResults.default(), \
+        "results with different number of processed files differ"
+    assert result != PurposeCounterResults(['a.json'], Counter({'programming': 1}),
+                                           Counter({'programming': 3}), Counter()), \
+        "results with different counters differ"
+    assert result != 'a.json', \
+        "results are not equal to object of other type"
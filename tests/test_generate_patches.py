@@ -44,6 +44,29 @@ def test_clone_repository(tmp_path: Path):
         "the repo was re-cloned into 'hellogitworld' subdirectory"
 
 
+def test_clone_repository_local(tmp_path: Path, example_repo: GitRepo):
+    """Test clone_repository() with local repository, which does not need network"""
+    repo = GitRepo.clone_repository(
+        repository=str(example_repo.repo),
+        working_dir=tmp_path,
+    )
+    assert repo is not None, \
+        "successfully cloned local repository"
+    assert repo.repo.name == example_repo.repo.name, \
+        "directory cloned into was extracted from 'Cloning into' line"
+
+    # clone the same repository again, into the same directory
+    repo = GitRepo.clone_repository(
+        repository=str(example_repo.repo),
+        working_dir=tmp_path,
+        make_path_absolute=True,
+    )
+    assert repo is not None and repo.repo.is_absolute(), \
+        "existing clone was found, and absolute path to it is used"
+    assert repo.repo == tmp_path / example_repo.repo.name, \
+        "directory was extracted from 'destination path already exists' line"
+
+
 def test_format_patch(tmp_path: Path):
     """Test format_patch() method in GitRepo class, and annotate_single_diff() function"""
     # MAYBE: create fixture
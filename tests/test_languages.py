@@ -8,10 +8,51 @@ from diffannotator import languages
 from diffannotator.languages import Languages
 
 
-# MAYBE: group assertions into separate tests
-def test_Languages(caplog: LogCaptureFixture):
+@pytest.mark.parametrize(
+    "file_name,expected,reason",
+    [
+        ("src/main.cpp",
+         {'language': 'C++', 'type': 'programming', 'purpose': 'programming'},
+         "for programming language"),
+        ('INSTALL',
+         {'language': 'Text', 'type': 'prose', 'purpose': 'documentation'},
+         "for 'INSTALL' file (no extension)"),
+        ('ChangeLog',
+         {'language': 'Text', 'type': 'prose', 'purpose': 'documentation'},
+         "for 'ChangeLog' file (no extension), via FILENAME_TO_LANGUAGES"),
+        ('README.md',
+         {'language': 'Markdown', 'type': 'prose', 'purpose': 'documentation'},
+         "for 'README.md' file"),
+        ('docs/index.rst',
+         {'purpose': 'documentation'},
+         "purpose of a documentation file"),
+        ('tests/test_cli.py',
+         {'purpose': 'test'},
+         "purpose of a test file"),
+        ("requirements.txt",
+         {'language': 'Pip Requirements', 'type': 'data', 'purpose': 'project'},
+         "'requirements.txt' is a 'data' type 'project' file, in 'Pip Requirements' language"),
+        (".gitignore",
+         # purpose comes from PATTERN_TO_PURPOSE, it would be 'data' without it
+         {'language': 'Ignore List', 'type': 'data', 'purpose': 'project'},
+         "for '.gitignore' file"),
+        ("Makefile",
+         {'language': 'Makefile', 'purpose': 'project'},
+         "'Makefile' is a project file"),
+        ("pyproject.toml",
+         {'language': 'TOML', 'type': 'data', 'purpose': 'project'},
+         "for 'pyproject.toml' file"),
+        ('linguist/.github/workflows/ci.yml',
+         {'language': 'YAML', 'type': 'data', 'purpose': 'data'},
+         "for GitHub Actions YAML file"),
+        ('.devcontainer/Dockerfile',
+         {'language': 'Dockerfile'},
+         "language of 'Dockerfile'"),
+    ]
+)
+def test_Languages(caplog: LogCaptureFixture, langs: Languages,
+                   file_name: str, expected: dict, reason: str):
     caplog.set_level(logging.WARNING)
-    langs = Languages()
 
     # NOTE: when running only this test, everything works,
     # when running all tests, this test fail because of the reason below
@@ -21,57 +62,19 @@ def test_Languages(caplog: LogCaptureFixture):
     if not languages.FILENAME_TO_LANGUAGES:
         pytest.skip("Something wrong: languages.FILENAME_TO_LANGUAGES is empty")
 
-    actual = langs.annotate("src/main.cpp")
-    expected = {'language': 'C++', 'type': 'programming', 'purpose': 'programming'}
-    assert actual == expected, "for programming language"
-
-    actual = langs.annotate('INSTALL')
-    expected = {'language': 'Text', 'type': 'prose', 'purpose': 'documentation'}
-    assert actual == expected, "for 'INSTALL' file (no extension)"
-
-    actual = langs.annotate('ChangeLog')
-    expected = {'language': 'Text', 'type': 'prose', 'purpose': 'documentation'}
-    assert actual == expected, "for 'ChangeLog' file (no extension), via FILENAME_TO_LANGUAGES"
-
-    actual = langs.annotate('README.md')
-    expected = {'language': 'Markdown', 'type': 'prose', 'purpose': 'documentation'}
-    assert actual == expected, "for 'README.md' file"
-
-    actual = langs.annotate('docs/index.rst')
-    assert actual['purpose'] == 'documentation', "purpose of a documentation file"
-
-    actual = langs.annotate('tests/test_cli.py')
-    assert actual['purpose'] == 'test', "purpose of a test file"
-
-    actual = langs.annotate("requirements.txt")
-    assert actual['purpose'] == 'project', "'requirements.txt' is a project file"
-    assert actual['type'] == 'data', "'requirements.txt' should be considered 'data'"
-    assert actual['language'] == 'Pip Requirements', "'requirements.txt' language is 'Pip Requirements'"
-
-    actual = langs.annotate(".gitignore")
-    expected = {'language': 'Ignore List', 'type': 'data', 'purpose': 'data'}
-    assert actual == expected, "for '.gitignore' file"
-
-    actual = langs.annotate("Makefile")
-    assert actual['language'] == 'Makefile', "language of 'Makefile' file"
-    assert actual['purpose'] == 'project', "'Makefile' is a project file"
-
-    actual = langs.annotate("pyproject.toml")
-    expected = {'language': 'TOML', 'type': 'data', 'purpose': 'project'}
-    assert actual == expected, "for 'pyproject.toml' file"
-
-    actual = langs.annotate('linguist/.github/workflows/ci.yml')
-    expected = {'language': 'YAML', 'type': 'data', 'purpose': 'data'}
-    assert actual == expected, "for GitHub Actions YAML file"
-
-    actual = langs.annotate('.devcontainer/Dockerfile')
-    assert actual['language'] == 'Dockerfile', "language of 'Dockerfile'"
+    actual = langs.annotate(file_name)
+    # compare only those fields that are present in `expected`
+    actual = {key: value for key, value in actual.items() if key in expected}
+    assert actual == expected, reason
 
-    assert len(caplog.messages) == 0, "there was nothing logged so far"
+    assert len(caplog.messages) == 0, "there was nothing logged"
     if caplog.text:
         print(caplog.text)
 
-    caplog.clear()
+
+def test_Languages_unknown(caplog: LogCaptureFixture, langs: Languages):
+    caplog.set_level(logging.WARNING)
+
     file_name = ".unknownprojectrc"
     actual = langs.annotate(file_name)
     expected = {'language': 'unknown', 'type': 'other', 'purpose': 'other'}
@@ -80,10 +83,8 @@ def test_Languages(caplog: LogCaptureFixture):
     assert file_name in caplog.text, "mention file name in the warning"
 
 
-# TODO?: Make `langs = Languages()` into a fixture
-def test_languages_extra_cases_linux(caplog: LogCaptureFixture):
+def test_languages_extra_cases_linux(caplog: LogCaptureFixture, langs: Languages):
     caplog.set_level(logging.WARNING)
-    langs = Languages()
 
     # NOTE: when running only this test, everything works,
     # when running all tests, this test fail because of the reason below
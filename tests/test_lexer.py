@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
 """Test cases for 'src/diffannotator/lexer.py' module"""
+import logging
 from textwrap import dedent
 
+import pytest
 from pygments.lexer import Lexer as PygmentsLexer
 from pygments.lexers import CLexer
+from pygments.lexers.special import TextLexer
 
 from diffannotator.lexer import Lexer
 
-LEXER = Lexer()
 
-
-def test_get_lexer():
-    lex_c = LEXER.get_lexer('main.c')
+def test_get_lexer(lexer: Lexer):
+    lex_c = lexer.get_lexer('main.c')
     # NOTE: for some reason pygments.lexer.Lexer did not work here
     # AttributeError: module 'pygments' has no attribute 'lexer'
     assert isinstance(lex_c, PygmentsLexer), \
@@ -19,26 +20,67 @@ def test_get_lexer():
     assert isinstance(lex_c, CLexer), \
         "got a C lexer"
 
-    another_lex_c = LEXER.get_lexer('src/stats.c')
+    another_lex_c = lexer.get_lexer('src/stats.c')
     assert another_lex_c == lex_c, \
         "got cached lexer"
 
 
-def test_lex():
+def test_lex(lexer: Lexer):
     example_C_code = dedent('''\
      /**
       * brief       Calculate approximate memory requirements for raw encoder
       *
       */
       int i = 1; /* an int */''')
-    # NOTE: currently forcing it to a list is not necessary
-    tokens = list(LEXER.lex(filename='main.c', code=example_C_code))
+    # consume tokens in a single pass, without creating list of all tokens
+    first_token = None
+    parts = []
+    for i, token in enumerate(lexer.lex(filename='main.c', code=example_C_code)):
+        if i == 0:
+            first_token = token
+        parts.append(token[2])
 
-    assert len(tokens[0]) == 3, \
+    assert len(first_token) == 3, \
         "lex returns iterable of 3-element tuples"
-    assert tokens[0][0] == 0, \
+    assert first_token[0] == 0, \
         "lex first token starts at position 0 in source"
 
-    concat = ''.join([elem[2] for elem in tokens])
+    concat = ''.join(parts)
     assert concat == example_C_code, \
         "lex parses all source code, and it is recoverable from tokens"
+
+
+def test_lexer_for_key_shared(lexer: Lexer):
+    lex_py = Lexer().get_lexer('src/main.py')
+    another_lex_py = Lexer().get_lexer('tests/test_main.py')
+    assert another_lex_py is lex_py, \
+        "lexer is shared between Lexer instances"
+
+    lex_unknown = lexer.get_lexer('data.unknown-extension')
+    assert isinstance(lex_unknown, TextLexer), \
+        "fallback to Text lexer for unknown file type"
+
+
+def test_get_lexer_unknown_warning(caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.WARNING, logger='diffannotator.lexer'):
+        Lexer().get_lexer('data/first.unknown-extension')
+        Lexer().get_lexer('data/second.unknown-extension')
+    assert [record.getMessage() for record in caplog.records] == [
+        "Warning: No lexer found for 'data/first.unknown-extension', trying Text lexer",
+        "Warning: No lexer found for 'data/second.unknown-extension', trying Text lexer",
+    ], "warning names the file, once per Lexer instance and key (like before sharing lexers)"
+
+    caplog.clear()
+    Lexer().get_lexer('notes.txt')
+    assert not caplog.records, "no warning if Text lexer was found for the file"
+
+
+def test_get_lexer_filename_patterns(lexer: Lexer):
+    assert lexer.get_lexer('CMakeLists.txt').name == 'CMake', \
+        "lexer for filename pattern wins over lexer for the suffix"
+    assert isinstance(lexer.get_lexer('notes.txt'), TextLexer), \
+        "other files with the same suffix use lexer for the suffix"
+    assert lexer.get_lexer('Makefile.am').name == 'Makefile', \
+        "filename pattern with a prefix and a wildcard suffix"
+    assert lexer.get_lexer('templates/page.html.j2').name == 'HTML+Django/Jinja', \
+        "filename pattern with more than one suffix"
@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 """Test cases for 'src/diffannotator/utils/git.py' module"""
+import os
 import subprocess
 import textwrap
-from typing import Optional
+import threading
+from collections.abc import Iterator
+from pathlib import Path
 
 import psutil
 import pytest
 from unidiff import PatchSet, PatchedFile
 
+from diffannotator.utils import git as git_module
 from diffannotator.utils.git import decode_c_quoted_str, GitRepo, DiffSide, AuthorStat, parse_shortlog_count, ChangeSet, \
-    maybe_close_subprocess, get_patched_file_mode, changes_survival_perc, GitFileMode
+    maybe_close_subprocess, get_patched_file_mode, changes_survival_perc, GitFileMode, _parse_commit_text, \
+    select_core_authors, parse_shortlog_count_bytes
 from tests.conftest import default_branch, example_repo, example_repo_utf8
 
 
@@ -17,6 +22,8 @@ def test_decode_c_quoted_str():
     """Test decode_c_quoted_str() function"""
     assert r'simple text' == decode_c_quoted_str(r'simple text'), \
         'non-encoded text passthrough'
+    assert r'quoted text' == decode_c_quoted_str(r'"quoted text"'), \
+        'quoted text without escape sequences'
     assert r'some text\with slash and "quote"' == \
            decode_c_quoted_str(r'"some text\\with slash and \"quote\""'), \
         'c-quoted quotation marks and backslashes'
@@ -27,10 +34,17 @@ def test_decode_c_quoted_str():
         'c-quoted tab character'
     assert r'zażółć' == decode_c_quoted_str(r'"za\305\274\303\263\305\202\304\207"'), \
         'c-quoted utf8'
+    assert r'zażółć' == decode_c_quoted_str(rb'"za\305\274\303\263\305\202\304\207"'), \
+        'c-quoted utf8, as bytes'
+    assert r'zażółć' == decode_c_quoted_str('zażółć'.encode()), \
+        'non-encoded bytes are decoded'
 
     with pytest.raises(ValueError):
         decode_c_quoted_str(r'"unknown escape \x"')
 
+    with pytest.raises(ValueError):
+        decode_c_quoted_str(rb'"unknown escape \x"')
+
     with pytest.raises(ValueError):
         decode_c_quoted_str(r'"interrupted octal escape \30z"')
 
@@ -44,6 +58,38 @@ def test_decode_c_quoted_str():
         decode_c_quoted_str(r'"\305\477"')
 
 
+def test_parse_commit_text():
+    """Test _parse_commit_text() function, with raw commit object format"""
+    commit_text = textwrap.dedent("""\
+    tree 417e98fd5c1f9ddfbdee64c98256998958d901ce
+    parent fe4a622e5202cd990c8ec853d56e25922f263243
+    parent 3525f1dbc18ae36ca9c671e807d6aac2ac432600
+    author A U Thor <author@example.com> 1112912053 -0600
+    committer C O Mitter <committer@example.com> 1693598847 +0200
+    gpgsig -----BEGIN PGP SIGNATURE-----
+     
+     author Not An Author <fake@example.com> 0 +0000
+     -----END PGP SIGNATURE-----
+
+    Commit summary
+
+    Optional longer description
+    """)
+    commit_data = _parse_commit_text(commit_text, with_parents_line=False, indented_body=False)
+
+    assert commit_data['tree'] == '417e98fd5c1f9ddfbdee64c98256998958d901ce', \
+        "'tree' header was parsed"
+    assert commit_data['parents'] == ['fe4a622e5202cd990c8ec853d56e25922f263243',
+                                      '3525f1dbc18ae36ca9c671e807d6aac2ac432600'], \
+        "all 'parent' headers were parsed, in order"
+    assert commit_data['author']['name'] == 'A U Thor', \
+        "'author' header was parsed, and is not overwritten by gpgsig contents"
+    assert commit_data['committer']['timestamp'] == 1693598847, \
+        "'committer' header was parsed"
+    assert commit_data['message'] == 'Commit summary\n\nOptional longer description\n', \
+        "commit message was extracted"
+
+
 def test_list_files(example_repo: GitRepo):
     """Test that GitRepo.list_files() returns correct list of files"""
     expected = [
@@ -62,6 +108,25 @@ def test_list_files(example_repo: GitRepo):
     assert sorted(expected) == sorted(actual), "list of files in HEAD"
 
 
+def test_list_files_iter(example_repo: GitRepo, monkeypatch: pytest.MonkeyPatch):
+    """Test that GitRepo.list_files_iter() generates the same files as list_files()"""
+    files_iter = example_repo.list_files_iter()
+    assert isinstance(files_iter, Iterator), "list_files_iter() returns iterator"
+    assert list(files_iter) == example_repo.list_files(), \
+        "list_files_iter() generates the same files as list_files()"
+
+    # file names are split between chunks
+    monkeypatch.setattr(example_repo, 'read_chunk_size', 3)
+    assert list(example_repo.list_files_iter()) == example_repo.list_files(), \
+        "list_files_iter() works when paths span many chunks"
+    assert list(example_repo.list_changed_files_iter('v2')) == example_repo.list_changed_files('v2'), \
+        "list_changed_files_iter() works when paths span many chunks"
+
+    files_iter = example_repo.list_files_iter()
+    next(files_iter)
+    files_iter.close()  # no errors, no ResourceWarning
+
+
 def test_list_changed_files(example_repo: GitRepo):
     """Test that GitRepo.list_changed_files returns correct list of files"""
     expected = [
@@ -92,6 +157,92 @@ def test_diff_file_status(example_repo):
     assert expected == actual, "status of changed files in v2"
 
 
+def test_diff_file_status_unusual_names(tmp_path: Path):
+    """Test that GitRepo.diff_file_status handles file names with TAB and non-ASCII characters"""
+    repo_path = str(tmp_path)
+    subprocess.run(['git', 'init', '-q', repo_path], check=True)
+    tmp_path.joinpath('old\tname').write_text('contents\n')
+    subprocess.run(['git', '-C', repo_path, 'add', '.'], check=True)
+    subprocess.run(['git', '-C', repo_path, '-c', 'user.name=A U Thor', '-c', 'user.email=author@example.com',
+                    'commit', '-q', '-m', 'Initial commit'], check=True)
+    subprocess.run(['git', '-C', repo_path, 'mv', 'old\tname', 'zażółć'], check=True)
+    tmp_path.joinpath('new\tfile').write_text('new\n')
+    # file name that is not valid UTF-8
+    with open(os.path.join(os.fsencode(repo_path), b'bad\xffname'), 'wb') as fp:
+        fp.write(b'bad\n')
+    subprocess.run(['git', '-C', repo_path, 'add', '.'], check=True)
+    subprocess.run(['git', '-C', repo_path, '-c', 'user.name=A U Thor', '-c', 'user.email=author@example.com',
+                    'commit', '-q', '-m', 'Rename and add'], check=True)
+
+    repo = GitRepo(repo_path)
+    actual = repo.diff_file_status('HEAD')
+    assert actual == {
+        ('old\tname', 'zażółć'): 'R',
+        (None, 'new\tfile'): 'A',
+        (None, 'bad\\xffname'): 'A',
+    }, "file names are neither quoted nor split on TAB, invalid bytes are escaped"
+    changes_info, _, _ = repo.changed_lines_extents('HEAD')
+    assert {post for _, post in actual} == set(changes_info), \
+        "the same file names as in changed_lines_extents()"
+
+    # file names in diff headers are not quoted, invalid bytes are passed as-is
+    subprocess.run(['git', '-C', repo_path, 'config', 'core.quotePath', 'false'], check=True)
+    assert repo.changed_lines_extents('HEAD')[0] == changes_info, \
+        "the same file names with core.quotePath=false"
+    fast_changes_info, _, _ = repo.changed_lines_extents('HEAD', use_fast=True)
+    assert fast_changes_info == changes_info, \
+        "the same file names with use_fast=True"
+
+
+def test_file_contents_newline_in_name(tmp_path: Path):
+    """Test that GitRepo.file_contents and .open_file work for file names with newline"""
+    repo_path = str(tmp_path)
+    subprocess.run(['git', 'init', '-q', repo_path], check=True)
+    tmp_path.joinpath('with\nnewline').write_text('contents\n')
+    subprocess.run(['git', '-C', repo_path, 'add', '.'], check=True)
+    subprocess.run(['git', '-C', repo_path, '-c', 'user.name=A U Thor', '-c', 'user.email=author@example.com',
+                    'commit', '-q', '-m', 'Initial commit'], check=True)
+
+    repo = GitRepo(repo_path)
+    assert repo.file_contents('HEAD', 'with\nnewline') == 'contents\n', \
+        "contents of file with newline in its name"
+    with repo.open_file('HEAD', 'with\nnewline') as fpb:
+        assert fpb.read() == b'contents\n', "open_file() works for file with newline in its name"
+    assert repo.file_contents('HEAD', 'no\nsuch file') == '', \
+        "contents of file that does not exist is empty"
+    assert repo.read_objects(['HEAD:with\nnewline']) == [b'contents\n'], \
+        "read_objects() works for object with newline in name"
+    assert repo.read_object('HEAD:with') is None, \
+        "persistent `git cat-file` was not desynchronized"
+    repo.close_cat_file()
+
+
+def test_newline_in_object_name(example_repo):
+    """Test that object names with newline do not desynchronize persistent `git cat-file`"""
+    with pytest.raises(subprocess.CalledProcessError):
+        example_repo.get_commit_metadata('HEAD\nHEAD~1')
+    with pytest.raises(subprocess.CalledProcessError):
+        example_repo.get_commit_metadata('HEAD\ncontents v1')
+    assert example_repo.get_commit_metadata('v2')['id'] == example_repo.to_oid('v2'), \
+        "next request gets the response for its own object"
+    assert example_repo.to_oid('v1^{commit}') == example_repo.get_commit_metadata('v1')['id'], \
+        "persistent `git cat-file` process stays in sync"
+
+    assert example_repo.read_objects(['v1:subdir/subfile', 'HEAD\ncontents v1', 'v1:subdir/subfile']) \
+           == [b'subfile', None, b'subfile'], \
+        "read_objects() returns None for object with newline in name"
+    assert example_repo.are_valid_objects(['v1', 'HEAD\ninfo v1', 'v2']) == [True, False, True], \
+        "are_valid_objects() returns False for object with newline in name"
+    assert example_repo.filter_valid_commits(['v1', 'HEAD\ninfo v1', 'v2']) == ['v1', 'v2'], \
+        "filter_valid_commits() filters out object with newline in name"
+    assert list(example_repo.batched_info(['HEAD\ninfo v1'])) == [('HEAD\ninfo v1', 'missing', None)], \
+        "batched_info() returns object with newline in name as missing"
+    assert example_repo.to_oid('v2') == example_repo.get_commit_metadata('v2')['id'], \
+        "persistent `git cat-file` process stays in sync after batch requests"
+
+    example_repo.close_cat_file()
+
+
 def test_unidiff(example_repo):
     """Test extracting data from GitRepo.unidiff"""
     patch = example_repo.unidiff()
@@ -151,6 +302,23 @@ def test_unidiff_missing(example_repo):
         example_repo.unidiff('non_existent')
 
 
+def test_has_parent(example_repo):
+    """Test GitRepo._has_parent, used by GitRepo.unidiff to handle root commits"""
+    assert example_repo._has_parent('v2'), \
+        "second commit has parent"
+    assert not example_repo._has_parent('v1'), \
+        "first commit is a root commit, without parents"
+
+    root_oid = example_repo.to_oid('v1^{commit}')
+    assert not example_repo._has_parent(root_oid), \
+        "root commit given by its SHA-1 has no parents"
+    assert example_repo._has_parent_cache[root_oid] is False, \
+        "result for full SHA-1 identifier is cached"
+    assert 'v1' not in example_repo._has_parent_cache, \
+        "result for reference (which can change) is not cached"
+    example_repo.close_cat_file()
+
+
 def test_changed_lines_extents(example_repo):
     # TODO?: use pytest-subtest plugin
     # with self.subTest("for HEAD (last commit)"):
@@ -170,6 +338,13 @@ def test_changed_lines_extents(example_repo):
     }
     assert expected == actual, "changed lines for post-image for changed files match (v1)"
 
+    for commit in ['v1', 'v1.5', 'v2']:
+        actual, diff_lines, patch = example_repo.changed_lines_extents(commit, use_fast=True)
+        assert actual == example_repo.changed_lines_extents(commit)[0], \
+            f"use_fast=True gives the same extents as parsing PatchSet ({commit})"
+        assert diff_lines == {} and patch is None, \
+            "use_fast=True does not parse diff lines"
+
 
 def test_file_contents(example_repo):
     """Test that GitRepo.file_contents returns file contents as text"""
@@ -181,6 +356,70 @@ def test_file_contents(example_repo):
     actual = example_repo.file_contents('v2', 'renamed_file')
     assert expected == actual, "contents of 'renamed_file' at v2"
 
+    assert example_repo.file_contents('v1', 'non_existent') == '', \
+        "contents of file that does not exist is empty"
+
+    example_repo.close_cat_file()
+
+
+def test_read_object(example_repo):
+    """Test that GitRepo.read_object reuses persistent `git cat-file --batch` process"""
+    assert example_repo.read_object('v1:example_file') == b'example\n2\n3\n4\n5\n', \
+        "contents of 'example_file' at v1"
+    assert len(example_repo._cat_file_pool) == 1, \
+        "a single `git cat-file --batch` process was started"
+    with example_repo._acquire_cat_file() as proc:
+        pass
+    assert example_repo.read_object('v1:subdir/subfile') == b'subfile', \
+        "contents of 'subdir/subfile' at v1 (without final newline)"
+    with example_repo._acquire_cat_file() as proc_2:
+        assert proc_2 is proc, \
+            "the `git cat-file --batch` process is reused"
+
+    # each thread uses its own process
+    results = []
+    thread = threading.Thread(target=lambda: results.append(example_repo.read_object('v2:renamed_file')))
+    thread.start()
+    thread.join()
+    assert results == [b'example\n2\n3\n4b\n5\n'], \
+        "read_object() works correctly in another thread"
+    assert len(example_repo._cat_file_pool) == 2, \
+        "the other thread got its own `git cat-file --batch` process"
+
+    assert example_repo.read_object('v1:non existent') is None, \
+        "read_object returns None for non-existent object"
+    assert example_repo.read_object('v1:example_file') == b'example\n2\n3\n4\n5\n', \
+        "the process works after non-existent object"
+
+    objects = ['v1:example_file', 'v1:non existent', 'v2:renamed_file']
+    assert example_repo.read_objects(objects) == [example_repo.read_object(obj) for obj in objects], \
+        "read_objects() returns the same as read_object() for each object"
+    objects = ['v1:subdir/subfile', 'v1:non existent'] * 1000  # request larger than PIPE_BUF
+    assert example_repo.read_objects(objects) == [b'subfile', None] * 1000, \
+        "read_objects() works for large number of objects"
+
+    # error while the process is in use: it is discarded, so the next request is not desynchronized
+    with pytest.raises(KeyboardInterrupt):
+        with example_repo._acquire_cat_file() as failed_proc:
+            failed_proc.stdin.write(b'contents v1:example_file\n')
+            failed_proc.stdin.flush()
+            raise KeyboardInterrupt  # interrupted before the response was read
+    assert example_repo.read_object('v1:subdir/subfile') == b'subfile', \
+        "response to interrupted request is not read by the next request"
+    with pytest.raises(EOFError):
+        with example_repo._acquire_cat_file() as failed_proc:
+            failed_proc.kill()
+            failed_proc.wait()
+            example_repo._read_object_response(failed_proc)
+    assert example_repo.read_object('v1:subdir/subfile') == b'subfile', \
+        "new process is started after the previous one died"
+
+    example_repo.close_cat_file()
+    assert len(example_repo._cat_file_pool) == 0, \
+        "all processes are closed by .close_cat_file()"
+    assert proc.returncode is not None, \
+        "the `git cat-file --batch` process ended"
+
 
 def test_list_tags(example_repo):
         """Test that GitRepo.list_tags list all tags"""
@@ -206,9 +445,93 @@ def test_get_commit_metadata(example_repo):
     }, "author info matches"
     assert commit_info['committer']['committer'] == 'A U Thor <author@example.com>', \
         "committer matches repository setup"
+    assert commit_info['parents'] == [example_repo.get_commit_metadata('v2^')['id']], \
+        "single parent of 'v2' commit is 'v2^' commit"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        example_repo.get_commit_metadata('non_existent')
+
+    example_repo.close_cat_file()
+
+
+def test_get_commit_metadata_encoding(tmp_path: Path):
+    """Test that GitRepo.get_commit_metadata decodes commit using its 'encoding' header"""
+    repo_path = str(tmp_path)
+    subprocess.run(['git', 'init', '-q', repo_path], check=True)
+    tmp_path.joinpath('file').write_text('contents\n')
+    tmp_path.joinpath('message.txt').write_bytes('café latin1 msg\n'.encode('latin1'))
+    subprocess.run(['git', '-C', repo_path, 'add', 'file'], check=True)
+    subprocess.run(['git', '-C', repo_path, '-c', 'i18n.commitEncoding=ISO-8859-1',
+                    '-c', 'user.name=A U Thor', '-c', 'user.email=author@example.com',
+                    'commit', '-q', '-F', str(tmp_path / 'message.txt')], check=True)
 
+    commit_info = GitRepo(repo_path).get_commit_metadata('HEAD')
+    assert commit_info['message'] == 'café latin1 msg\n', \
+        "commit message was decoded using encoding from commit object"
 
-def test_is_valid_commit(example_repo):
+
+def test_get_commit_metadata_batch(example_repo):
+    """Test that GitRepo.get_commit_metadata_batch gives the same results as single commit version"""
+    commits = ['v1', 'v1.5', 'v2', 'HEAD']
+    actual = example_repo.get_commit_metadata_batch(commits)
+    expected = [example_repo.get_commit_metadata(commit) for commit in commits]
+    assert actual == expected, \
+        "get_commit_metadata_batch() returns the same results as get_commit_metadata(), in order"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        example_repo.get_commit_metadata_batch(['v1', 'non_existent'])
+
+    example_repo.close_cat_file()
+
+
+def test_map_commits(example_repo):
+    """Test that GitRepo.map_commits returns results in order, like serial calls"""
+    commits = ['v1', 'v1.5', 'v2', 'HEAD']
+    actual = example_repo.map_commits(example_repo.get_commit_metadata, commits, max_workers=2)
+    expected = [example_repo.get_commit_metadata(commit) for commit in commits]
+    assert actual == expected, \
+        "map_commits() returns the same results as calling function for each commit"
+    assert len(example_repo._cat_file_pool) == 1, \
+        "`git cat-file --batch` processes of worker threads were closed"
+
+    example_repo.close_cat_file()
+
+
+def test_worktree_at(example_repo):
+    """Test that GitRepo.worktree_at creates temporary working tree, and removes it"""
+    with example_repo.worktree_at('v1') as worktree_path:
+        assert worktree_path.joinpath('example_file').read_text() == 'example\n2\n3\n4\n5\n', \
+            "file contents in temporary working tree is from 'v1'"
+        assert not worktree_path.joinpath('new_file').exists(), \
+            "file added after 'v1' is not present in temporary working tree"
+        assert example_repo.get_current_branch() == default_branch, \
+            "main working tree is not changed"
+
+    assert not worktree_path.exists(), \
+        "temporary working tree was removed"
+    worktrees = subprocess.run(['git', '-C', example_repo.repo, 'worktree', 'list', '--porcelain'],
+                               capture_output=True, text=True, check=True).stdout
+    assert worktrees.count('worktree ') == 1, \
+        "only the main working tree remains"
+
+
+def test_to_oid(example_repo):
+    """Test that GitRepo.to_oid resolves references, and returns None for missing objects"""
+    head_oid = subprocess.run(['git', '-C', example_repo.repo, 'rev-parse', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    assert example_repo.to_oid('HEAD') == head_oid, "HEAD resolves to its SHA-1"
+    assert example_repo.to_oid('v2^{commit}') == head_oid, "v2 tag points to HEAD"
+    assert example_repo.to_oid(head_oid) == head_oid, "SHA-1 resolves to itself"
+    assert head_oid in example_repo._known_oids, "existence of SHA-1 is remembered"
+    assert example_repo.to_oid(head_oid) == head_oid, "SHA-1 resolves to itself (fast path)"
+
+    assert example_repo.to_oid('non_existent') is None, "no 'non_existent' reference"
+    assert example_repo.to_oid('0' * 40) is None, "no object with given SHA-1"
+    assert '0' * 40 not in example_repo._known_oids, "non-existing SHA-1 is not remembered"
+    assert example_repo.to_oid('HEAD:non existent') is None, "no such file at HEAD"
+
+
+def test_is_valid_commit(example_repo, monkeypatch: pytest.MonkeyPatch):
     """Test that GitRepo.is_valid_commit returns correct answer
 
     Tested only with references and <rev>^ notation, as the test repository
@@ -231,12 +554,20 @@ def test_is_valid_commit(example_repo):
     assert not example_repo.is_valid_commit("HEAD^3"), "HEAD^3 is invalid"
     assert not example_repo.is_valid_commit("HEAD~20"), "HEAD~20 is invalid"
 
+    def _no_run(*args, **kwargs):
+        raise AssertionError(f"unexpected subprocess.run({args[0] if args else ''!r})")
+
+    # the check is done with persistent `git cat-file` process, without spawning `git`
+    monkeypatch.setattr(subprocess, 'run', _no_run)
+    assert example_repo.is_valid_commit("v1"), "tag v1 is valid, without new git process"
+    assert not example_repo.is_valid_commit("HEAD~20"), "HEAD~20 is invalid, without new git process"
+    assert example_repo.to_oid("HEAD^") is not None, "to_oid() also does not spawn git process"
+
 
 def test_batch_command(example_repo):
     """Test that the GitRepo.batch_command property behaves sanely"""
-    assert example_repo._cat_file is None, "the property is not initialized yet"
-
-    maybe_close_subprocess(example_repo._cat_file)  # no error
+    # close per-thread `git cat-file` processes used by other methods, e.g. by .to_oid()
+    example_repo.close_cat_file()
 
     procs = psutil.Process().children(recursive=False)
     assert not [p for p in procs if p.name() in {'git', 'git.exe'}], \
@@ -250,57 +581,45 @@ def test_batch_command(example_repo):
     assert len([p for p in procs if p.name() in {'git', 'git.exe'}]) == 1, \
         "there is a single 'git' process started after .batch_command"
 
-    proc: Optional[subprocess.Popen] = example_repo._cat_file
-    assert proc is not None, "process was generated by .batch_command, and is not None"
+    proc: subprocess.Popen = proc_1
     assert isinstance(proc, subprocess.Popen), "process is a Popen object"
     assert proc.returncode is None, "the `git cat-file` didn't return (process is live)"
 
     actual = example_repo.are_valid_objects(["HEAD"])
     expected = [True]
     assert actual == expected, ".are_valid_object('HEAD') returns True"
+    assert example_repo.batch_command is proc, \
+        ".are_valid_objects() uses the same process as .batch_command"
 
-    maybe_close_subprocess(example_repo._cat_file)  # no error
-
-    proc = example_repo.batch_command
-    assert isinstance(proc, subprocess.Popen), ".batch_command returns a Popen object"
+    maybe_close_subprocess(proc)  # no error
     assert proc.returncode == 0, "the `git cat-file` returns success (process ended)"
 
     procs = psutil.Process().children(recursive=False)
     assert not [p for p in procs if p.name() in {'git', 'git.exe'}], \
         "there is no 'git' process running after calling maybe_close_subprocess()"
 
-    with pytest.raises(ValueError) as exc_info:
-        example_repo.are_valid_objects(["HEAD"])
-    assert "closed file" in str(exc_info.value), "the `git cat-file` process is closed"
+    new_proc = example_repo.batch_command
+    assert new_proc is not proc and new_proc.returncode is None, \
+        ".batch_command replaces process that has ended"
+    assert example_repo.are_valid_objects(["HEAD"]) == [True], \
+        ".are_valid_objects() works after the process was closed"
 
     example_repo.close_batch_command()  # no errors
 
-    #print(f"{example_repo._finalizer=}")
-    #print(f"{example_repo._finalizer.alive=}")
-    #print(f"{example_repo._finalizer.peek()=}")
-    #print(f"{example_repo._finalizer()=}")
-    #print(f"{example_repo._finalizer.detach()=}")
-    #print(f"{example_repo._finalizer.alive=}")
-
 
-@pytest.mark.xfail(reason="known failure of ._finalize() in .close_batch_command()")
 def test_close_batch_command(example_repo):
     """Test that GitRepo.close_batch_command() works correctly"""
-    assert example_repo._cat_file is None, \
-        "the ._cat_file property is not initialized by default"
-
     proc = example_repo.batch_command
-    assert example_repo._cat_file is not None, \
-        "the ._cat_file property is initialized by .batch_command"
     assert proc.returncode is None, \
         "the `git cat-file` didn't return (process is live)"
-    assert proc == example_repo._cat_file, \
-        "the ._cat_file property caches what .batch_command returns"
+    with example_repo._acquire_cat_file() as unbuffered_proc:
+        assert unbuffered_proc is not proc, \
+            "processes with and without `--buffer` are different"
 
     # main part of this test
     example_repo.close_batch_command()
-    assert example_repo._cat_file is None, \
-        "the ._cat_file property is set to None by .close_batch_command()"
+    assert len(example_repo._cat_file_pool) == 0, \
+        "all `git cat-file` processes are closed by .close_batch_command()"
 
     procs = psutil.Process().children(recursive=False)
     assert not [p for p in procs if p.name() in {'git', 'git.exe'}], \
@@ -315,6 +634,9 @@ def test_are_valid_objects(example_repo):
     actual = example_repo.are_valid_objects(['non_existent', 'v3', 'HEAD~20'], object_type='commit')
     assert actual == [False, False, False], "all provided commits are invalid"
 
+    actual = example_repo.are_valid_objects(iter(['HEAD', 'non_existent', 'v1']), object_type=None)
+    assert actual == [True, False, True], "objects can be given as one-shot iterator"
+
     # a shortened sha-1 identifier needs to be at least 4 characters long
     # you need a large enough repository to have an ambiguous 4-character prefix
     # this very repository (current repository) is large enough (using any object)
@@ -325,7 +647,7 @@ def test_are_valid_objects(example_repo):
 def test_filter_valid_commits(example_repo):
     """Test that GitRepo.filter_valid_commits returns the correct answer"""
     filtered = example_repo.filter_valid_commits(['HEAD', 'non_existent', 'v1', 'v2', 'v3', 'HEAD~20'])
-    assert list(filtered) == ['HEAD', 'v1', 'v2'], "filter only valid commits"
+    assert filtered == ['HEAD', 'v1', 'v2'], "filter only valid commits, returning list"
 
     filtered = example_repo.filter_valid_commits(['HEAD', 'non_existent', 'v1', 'v2', 'v3', 'HEAD~20'], to_oid=True)
     assert len(list(filtered)) == 3, "there were 3 valid commits (now oids)"
@@ -334,6 +656,67 @@ def test_filter_valid_commits(example_repo):
                                                  single_use=True)
     assert list(filtered) == ['HEAD', 'v1', 'v2'], "filtering with `single_use=True` works"
 
+    filtered = example_repo.filter_valid_commits(commit for commit in ['HEAD', 'non_existent', 'v1'])
+    assert list(filtered) == ['HEAD', 'v1'], "commits can be given as generator"
+
+
+def test_batched_info(example_repo):
+    """Test that GitRepo.batched_info returns information about all objects, in order"""
+    actual = list(example_repo.batched_info(['v1', 'HEAD:new_file', 'non_existent', 'v2^{tree}']))
+    assert [obj_type for _, obj_type, _ in actual] == ['commit', 'blob', 'missing', 'tree'], \
+        "object types are returned in the same order as objects"
+    assert actual[0][0] == example_repo.to_oid('v1'), \
+        "SHA-1 identifier of existing object is returned"
+    assert actual[2] == ('non_existent', 'missing', None), \
+        "missing object is returned by name, without size"
+    assert actual[1][2] == len(example_repo.file_contents('HEAD', 'new_file').encode()), \
+        "size of blob is returned"
+
+    objects = ['HEAD', 'non_existent'] * 1000
+    actual = list(example_repo.batched_info(objects))
+    assert len(actual) == len(objects), \
+        "large batch (written from a separate thread) does not deadlock"
+    assert list(example_repo.batched_info([])) == [], \
+        "no objects, no results"
+
+
+def test_acquire_batch(example_repo):
+    """Test that GitRepo uses extra `git cat-file --batch-command` when the process is busy"""
+    example_repo.close_cat_file()
+    primary = example_repo.batch_command
+    with example_repo._acquire_batch() as proc:
+        assert proc is primary, \
+            "process of the current thread is used if it is not busy"
+
+        # the process is in use
+        assert example_repo.are_valid_objects(['v2', 'v3']) == [True, False], \
+            "nested use of `git cat-file --batch-command` works"
+        assert len(example_repo._cat_file_pool) == 1, \
+            "extra process for nested use is not kept in the pool"
+    assert primary.returncode is None, "process is kept for reuse"
+
+    infos = example_repo.batched_info(['HEAD', 'v1'])
+    assert next(infos)[1] == 'commit', "first result is returned"
+    assert example_repo.filter_valid_commits(['v1', 'v3']) == ['v1'], \
+        "not exhausted batched_info() generator does not hold any process"
+    assert next(infos)[1] == 'commit', "generator was not disturbed by other use"
+
+    with example_repo._acquire_cat_file() as unbuffered:
+        assert example_repo.filter_valid_commits(['v1', 'v3'], single_use=True) == ['v1'], \
+            "filtering with `single_use=True` works"
+    assert primary.returncode is not None, "`single_use=True` closes the process that was used"
+    assert unbuffered.returncode is None, "`single_use=True` does not close other processes"
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(example_repo.are_valid_objects(['HEAD'])))
+    thread.start()
+    thread.join()
+    assert results == [[True]], "can be used from another thread"
+
+    example_repo.close_batch_command()
+    assert len(example_repo._cat_file_pool) == 0, \
+        "all processes are closed by .close_batch_command()"
+
 
 def test_get_current_branch(example_repo):
     """Basic test of GitRepo.get_current_branch"""
@@ -350,8 +733,15 @@ def test_resolve_symbolic_ref(example_repo):
     assert example_repo.resolve_symbolic_ref("v2") is None, \
         "'v2' is not a symbolic ref"
 
+    example_repo._symref_cache["HEAD"] = "refs/heads/stale"
+    assert example_repo.resolve_symbolic_ref("HEAD") == "refs/heads/stale", \
+        "result of resolving symbolic ref is cached"
+    example_repo.invalidate_ref_cache()
+    assert example_repo.resolve_symbolic_ref("HEAD") == f'refs/heads/{default_branch}', \
+        "after invalidating cache symbolic ref is resolved anew"
 
-def test_check_merged_into(example_repo):
+
+def test_check_merged_into(example_repo, monkeypatch: pytest.MonkeyPatch):
     """Test GitRepo.check_merged_into for various combinations of commit and into"""
     actual = example_repo.check_merged_into('v1')
     assert len(actual) > 0, "'v1' is merged [into HEAD]"
@@ -366,6 +756,25 @@ def test_check_merged_into(example_repo):
     actual = example_repo.check_merged_into('v2', 'refs/tags/v1')
     assert not actual, "'v2' is not merged into v1"
 
+    # patterns passed on command line instead of via '--stdin' (if it is supported at all)
+    monkeypatch.setattr(git_module, 'GIT_FOR_EACH_REF_STDIN_VERSION', (999,))
+    actual = example_repo.check_merged_into('v1', ['refs/heads/', 'refs/tags/'])
+    assert sorted(expected) == sorted(actual), \
+        "the same result with refs passed as command line arguments"
+
+
+def test_check_many_merged_into(example_repo):
+    """Test that GitRepo.check_many_merged_into gives the same results as GitRepo.check_merged_into"""
+    commits = ['v1', 'v2', 'v1.5']
+    for ref_pattern in ['HEAD', ['refs/heads/', 'refs/tags/'], 'refs/tags/v1']:
+        actual = example_repo.check_many_merged_into(commits, ref_pattern)
+        expected = [example_repo.check_merged_into(commit, ref_pattern) for commit in commits]
+        assert actual == expected, \
+            f"the same results as for check_merged_into(<commit>, {ref_pattern!r})"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        example_repo.check_many_merged_into(['v1', 'non_existent'])
+
 
 def test_reverse_blame(example_repo, subtests):
     with subtests.test("reverse blame from v1.5"):
@@ -502,6 +911,52 @@ def test_list_authors(example_repo):
     actual = parse_shortlog_count(authors_shortlog)
     assert sorted(expected) == sorted(actual), "parsed authors counts matches"
 
+    actual = parse_shortlog_count([b'     2\tA U Thor', b'     1\tJoe Random'])
+    assert actual == [AuthorStat(author=b'A U Thor', count=2), AuthorStat(author=b'Joe Random', count=1)], \
+        "parsed authors counts from bytes matches"
+    assert parse_shortlog_count([]) == [], \
+        "no authors for empty shortlog"
+
+    actual = parse_shortlog_count_bytes(b'     2\tA U Thor\n     1\tJoe Random\n')
+    assert actual == [AuthorStat(author='A U Thor', count=2), AuthorStat(author='Joe Random', count=1)], \
+        "parsed authors counts from raw output matches"
+    assert parse_shortlog_count_bytes(b'') == [], \
+        "no authors for empty raw shortlog output"
+
+
+def test_select_core_authors():
+    """Test select_core_authors() function, including handling of ties"""
+    authors_stats = [AuthorStat('C', 2), AuthorStat('A', 5), AuthorStat('D', 1), AuthorStat('B', 2)]
+
+    core_authors, perc = select_core_authors(authors_stats, perc=0.4)
+    assert core_authors == [AuthorStat('A', 5)], \
+        "single author with more than 40% of commits"
+    assert perc == 0.5, \
+        "5 out of 10 commits"
+
+    core_authors, perc = select_core_authors(authors_stats, perc=0.5)
+    assert [auth.author for auth in core_authors] == ['A', 'C', 'B'], \
+        "tied authors are all included"
+    assert perc == 0.9, \
+        "9 out of 10 commits"
+
+
+def test_find_commits_by_timestamps(example_repo):
+    """Test GitRepo.find_commits_by_timestamps and GitRepo.find_commit_by_timestamp"""
+    head_timestamp = int(subprocess.run(['git', '-C', example_repo.repo, 'log', '-1', '--format=%ct'],
+                                        capture_output=True, text=True, check=True).stdout)
+    head_oid = example_repo.to_oid('HEAD')
+
+    actual = example_repo.find_commits_by_timestamps([head_timestamp + 1, 0, head_timestamp])
+    assert actual == [head_oid, '', head_oid], \
+        "found HEAD for dates not older than it, and nothing for the very old date"
+    assert example_repo.find_commit_by_timestamp(head_timestamp) == head_oid, \
+        "single date version gives the same result"
+    assert example_repo.find_commit_by_timestamp(0) == '', \
+        "single date version finds nothing for the very old date"
+    assert example_repo.find_commits_by_timestamps([]) == [], \
+        "no dates, no commits"
+
 
 def test_find_roots(example_repo):
     """Test GitRepo.find_roots() method"""
@@ -545,6 +1000,24 @@ def test_get_config(example_repo):
     actual = example_repo.get_config('not-exists')
     assert actual is None, "returns `None` for invalid variable name"
 
+    assert example_repo.get_config('User.Name') == expected, \
+        "section and variable names are case-insensitive"
+    assert example_repo.get_config('core.bare', value_type='bool') == 'false', \
+        "value is canonicalized according to `value_type`"
+
+    subprocess.run(['git', '-C', example_repo.repo, 'config', 'test.cached', 'before'], check=True)
+    example_repo.invalidate_config_cache()
+    assert example_repo.get_config('test.cached') == 'before', \
+        "got expected value for newly set variable"
+    subprocess.run(['git', '-C', example_repo.repo, 'config', 'test.cached', 'after'], check=True)
+    assert example_repo.get_config('test.cached') == 'before', \
+        "results of get_config() are cached"
+    example_repo.invalidate_config_cache()
+    assert example_repo.get_config('test.cached') == 'after', \
+        "after invalidating cache, the current value is returned"
+    subprocess.run(['git', '-C', example_repo.repo, 'config', '--unset', 'test.cached'], check=True)
+    example_repo.invalidate_config_cache()
+
 
 def test_metadata_extraction_in_ChangeSet(example_repo):
     """Test that ChangeSet constructor can extract commit metadata"""
@@ -571,6 +1044,19 @@ def test_metadata_extraction_in_ChangeSet(example_repo):
     assert patch_log.commit_metadata == revision_metadata, \
         "correctly extracted expected metadata from .log_p() result"
 
+    # many commits, separated by '\0' in the output of `git log -p -z`
+    patches_log = list(example_repo.log_p(revision_range=('-3', revision), wrap=True))
+    assert [patch.commit_id for patch in patches_log] == \
+           [example_repo.to_oid(rev) for rev in ('v2', 'v1.5', 'v1')], \
+        ".log_p() returns all commits, in expected order"
+    assert [patch.commit_metadata for patch in patches_log] == \
+           [example_repo.get_commit_metadata(rev) for rev in ('v2', 'v1.5', 'v1')], \
+        "correctly extracted metadata for each commit from .log_p() result"
+
+    texts_log = list(example_repo.log_p(revision_range=('-3', revision), wrap=False))
+    assert all(text.startswith('commit ') and '\0' not in text for text in texts_log), \
+        "each commit text starts with 'commit ', and does not include '\\0' separator"
+
 
 def test_ChangeSet_from_filename():
     commit_id = 'c0dcf39b046d1b4ff6de14ac99ad9a1b10487512'
@@ -599,6 +1085,57 @@ def test_ChangeSet_from_filename():
         "The commit message has exactly one line, ending in '\\n'"
 
 
+def test_ChangeSet_from_filenames():
+    """Test that ChangeSet.from_filenames gives the same results as ChangeSet.from_filename"""
+    filenames = [
+        'tests/test_dataset/tqdm-1/c0dcf39b046d1b4ff6de14ac99ad9a1b10487512.diff_with_raw',
+        'tests/test_dataset/with_mode_change.diff',
+        'tests/test_dataset/binary_files_differ.diff',
+    ]
+    changesets = list(ChangeSet.from_filenames(filenames, n_jobs=2))
+
+    assert len(changesets) == len(filenames), \
+        "one ChangeSet per file"
+    for filename, changeset in zip(filenames, changesets):
+        expected = ChangeSet.from_filename(filename)
+        assert isinstance(changeset, ChangeSet), \
+            "ChangeSet.from_filenames returns ChangeSet objects"
+        assert changeset.commit_id == expected.commit_id, \
+            f"commit_id matches for '{filename}'"
+        assert changeset.commit_metadata == expected.commit_metadata, \
+            f"commit metadata matches for '{filename}'"
+        assert str(changeset) == str(expected), \
+            f"changes match for '{filename}'"
+
+
+def test_ChangeSet_from_str():
+    """Test that ChangeSet created from str matches one created from file"""
+    commit_id = 'c0dcf39b046d1b4ff6de14ac99ad9a1b10487512'
+    filename_diff_full = f'tests/test_dataset/tqdm-1/{commit_id}.diff_with_raw'
+    changeset_from_file = ChangeSet.from_filename(filename_diff_full)
+
+    with open(filename_diff_full, encoding='utf-8') as fp:
+        patch_text = fp.read()
+    changeset_from_str = ChangeSet(patch_text, commit_id=commit_id)
+    assert changeset_from_str.commit_metadata == changeset_from_file.commit_metadata, \
+        "the same commit metadata extracted from str and from file"
+    assert str(changeset_from_str) == str(changeset_from_file), \
+        "the same patch parsed from str and from file"
+
+    patch_text = textwrap.dedent("""\
+    diff --git a/example.c b/example.c
+    --- a/example.c
+    +++ b/example.c
+    @@ -1,2 +1,2 @@
+     int i;
+    -\f
+    +\f\r
+    """)
+    changeset_with_ff = ChangeSet(patch_text, commit_id=commit_id)
+    assert len(changeset_with_ff[0][0]) == 3, \
+        "form feed and carriage return inside changed lines do not split lines"
+
+
 def test_ChangeSet_from_patch_file_with_cr():
     diff_filename = 'tests/test_dataset/qtile/4424a39ba5d6374cc18b98297f6de8a82c37ab6a.diff'
 
@@ -611,7 +1148,7 @@ def test_get_patched_file_mode(subtests):
     """Test the `get_patched_file_mode()` function for different cases"""
     with subtests.test("binary files, no mode change"):
         diff_no_mode_change = 'tests/test_dataset/binary_files_differ.diff'
-        patch = ChangeSet.from_filename(diff_no_mode_change)
+        patch = ChangeSet.from_filename(diff_no_mode_change, metadata_only=True)
         changed_file = patch[0]
         actual_src = get_patched_file_mode(changed_file,
                                            side=DiffSide.PRE)
@@ -623,7 +1160,7 @@ def test_get_patched_file_mode(subtests):
 
     with subtests.test("ordinary files, with mode change"):
         diff_with_mode_change = 'tests/test_dataset/with_mode_change.diff'
-        patch = ChangeSet.from_filename(diff_with_mode_change)
+        patch = ChangeSet.from_filename(diff_with_mode_change, metadata_only=True)
         changed_file = patch[0]
         actual_src = get_patched_file_mode(changed_file,
                                            side=DiffSide.PRE)
@@ -636,7 +1173,7 @@ def test_get_patched_file_mode(subtests):
 
     with subtests.test("submodule without --recurse-submodules"):
         diff_new_submodule = 'tests/test_dataset/with_submodule_added.diff'
-        patch = ChangeSet.from_filename(diff_new_submodule)
+        patch = ChangeSet.from_filename(diff_new_submodule, metadata_only=True)
         changed_file = patch[0]
         actual = get_patched_file_mode(changed_file)
         expected = '160000'
@@ -652,7 +1189,7 @@ def test_get_patched_file_mode(subtests):
         assert actual_dst == expected_dst, "destination file mode matches (submodule added)"
 
         diff_rem_submodule = 'tests/test_dataset/with_submodule_removed.diff'
-        patch = ChangeSet.from_filename(diff_rem_submodule)
+        patch = ChangeSet.from_filename(diff_rem_submodule, metadata_only=True)
         changed_file = patch[0]
         actual_src = get_patched_file_mode(changed_file,
                                            side=DiffSide.PRE)
@@ -738,6 +1275,8 @@ def test_repo_utf8(example_repo_utf8):
         n_lines = sum([pair[1] - pair[0] + 1 for pair in extents_data])
         assert n_lines == len(actual[1][file_name]),\
             f"changed_lines_extents() extents matches added lines for {file_name}"
+    assert example_repo_utf8.changed_lines_extents(use_fast=True)[0] == expected, \
+        "changed_lines_extents(use_fast=True) handles c-quoted file names"
 
     actual = example_repo_utf8.log_p(wrap=False)
     actual = list(actual)